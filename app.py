@@ -1,13 +1,12 @@
 import streamlit as st
-import pandas as pd
 import numpy as np
 import plotly.express as px
-import plotly.graph_objects as go
-from datetime import datetime, timedelta
+from datetime import datetime
 import time
 import base64
 
 from utils.data_fetcher import fetch_weather_data, get_forest_locations
+from utils.history import create_history, append_reading, history_to_frame
 from utils.visualization_streamlit import create_plotly_map, plot_temperature_history, create_temperature_gauge, add_animated_icon
 
 # Set page configuration
@@ -18,13 +17,26 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
-# Add Font Awesome to enable icons
-st.markdown("""
+# Figure builders are pure functions of their inputs, so their results are cached.
+# Reruns triggered by unrelated widgets (e.g. the raw data checkbox or the refresh
+# interval) then reuse the existing figures instead of rebuilding them. Callers pass
+# temperatures rounded to 0.1°C so equal readings share an entry, and the caches are
+# bounded since every threshold combination adds one. cache_resource hands back the
+# shared figure without pickling (st.cache_data would unpickle a fully validated
+# copy on every hit, which costs more than building the figure); st.plotly_chart
+# doesn't modify it.
+@st.cache_resource(show_spinner=False, max_entries=64)
+def build_temperature_gauge(temperature, warning_threshold, danger_threshold):
+    return create_temperature_gauge(temperature, warning_threshold, danger_threshold)
+
+@st.cache_resource(show_spinner=False, max_entries=64)
+def build_temperature_map(lat, lon, temperature, warning_threshold, danger_threshold, location_name):
+    return create_plotly_map(lat, lon, temperature, warning_threshold, danger_threshold, location_name)
+
+# Static page styles (Font Awesome icons, animated title, history header and
+# footer) are defined once and injected in a single block on each rerun
+PAGE_STYLES = """
 <link rel="stylesheet" href="https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.0.0/css/all.min.css">
-""", unsafe_allow_html=True)
-
-# Application title with animated header
-st.markdown("""
 <style>
 @keyframes color-change {
     0% { color: #2E8B57; }  /* Forest green */
@@ -38,9 +50,75 @@ st.markdown("""
     animation: color-change 5s infinite;
     padding: 0.5rem 0;
 }
+
+@keyframes slide-in {
+    0% { transform: translateX(-100%); opacity: 0; }
+    100% { transform: translateX(0); opacity: 1; }
+}
+
+.animated-header {
+    animation: slide-in 1.5s ease-out;
+}
+
+@keyframes pulse {
+    0% { opacity: 0.7; }
+    50% { opacity: 1; }
+    100% { opacity: 0.7; }
+}
+
+.footer-container {
+    margin-top: 20px;
+    padding: 10px;
+    border-radius: 5px;
+    background-color: #f0f0f0;
+}
+
+.update-progress {
+    height: 5px;
+    background-color: #dcdcdc;
+    border-radius: 5px;
+    margin-top: 10px;
+    position: relative;
+}
+
+.update-progress-bar {
+    height: 100%;
+    background-color: #2E8B57;
+    border-radius: 5px;
+    animation: pulse 2s infinite;
+}
+
+.footer-text {
+    margin-bottom: 5px;
+    font-weight: bold;
+}
+
+.time-info {
+    display: flex;
+    justify-content: space-between;
+    font-size: 0.8rem;
+    color: #666;
+}
 </style>
-<div class="animated-title">🌲 Forest Temperature Monitoring System</div>
-""", unsafe_allow_html=True)
+"""
+
+# Shortest selectable refresh interval (minutes); the history buffers are sized to
+# hold 24 hours of readings at this rate, the most any interval can retain
+MIN_REFRESH_INTERVAL = 5
+HISTORY_CAPACITY = 24 * 60 // MIN_REFRESH_INTERVAL
+
+TITLE_HTML = '<div class="animated-title">🌲 Forest Temperature Monitoring System</div>'
+
+HISTORY_HEADER_HTML = """
+<div class="animated-header">
+    <h3>Temperature History</h3>
+</div>
+"""
+
+st.markdown(PAGE_STYLES, unsafe_allow_html=True)
+
+# Application title with animated header
+st.markdown(TITLE_HTML, unsafe_allow_html=True)
 
 st.markdown("Monitor forest temperatures to prevent fires and protect wildlife")
 
@@ -57,7 +135,7 @@ selected_forest = st.sidebar.selectbox(
 # Refresh rate
 refresh_interval = st.sidebar.slider(
     "Data Refresh Interval (minutes)", 
-    min_value=5, 
+    min_value=MIN_REFRESH_INTERVAL, 
     max_value=60, 
     value=15, 
     step=5
@@ -78,15 +156,18 @@ warning_threshold = st.sidebar.slider(
     value=30
 )
 
+# Timestamps are kept as second-resolution numpy datetimes (local time), the same
+# representation the history buffer stores, so no conversion happens on append
+current_time = np.datetime64(datetime.now(), 's')
+
 # Fetch the last refresh time from session state or initialize it
 if 'last_refresh' not in st.session_state:
-    st.session_state.last_refresh = datetime.now() - timedelta(minutes=refresh_interval)
+    st.session_state.last_refresh = current_time - np.timedelta64(refresh_interval, 'm')
     st.session_state.temperature_history = {}
     st.session_state.current_temp_data = None
 
 # Check if it's time to refresh data
-current_time = datetime.now()
-time_diff = (current_time - st.session_state.last_refresh).total_seconds() / 60
+time_diff = (current_time - st.session_state.last_refresh) / np.timedelta64(1, 'm')
 
 # Force refresh button
 if st.sidebar.button("Refresh Data Now"):
@@ -94,7 +175,8 @@ if st.sidebar.button("Refresh Data Now"):
 
 # Initialize temperature history if not exists
 if selected_forest not in st.session_state.temperature_history:
-    st.session_state.temperature_history[selected_forest] = []
+    st.session_state.temperature_history[selected_forest] = create_history(HISTORY_CAPACITY)
+forest_history = st.session_state.temperature_history[selected_forest]
 
 # Refresh data if needed
 if time_diff >= refresh_interval:
@@ -111,19 +193,15 @@ if time_diff >= refresh_interval:
             st.session_state.current_temp_data = weather_data
             
             # Update temperature history (keep last 24 hours)
-            temp_entry = {
-                'timestamp': current_time,
-                'temperature': weather_data['current_temp'],
-                'humidity': weather_data['humidity'],
-                'wind_speed': weather_data['wind_speed']
-            }
-            
-            st.session_state.temperature_history[selected_forest].append(temp_entry)
-            
-            # Keep only last 24 hours of data (assuming 15-minute intervals = 96 points)
             max_history = int(24 * 60 / refresh_interval)
-            if len(st.session_state.temperature_history[selected_forest]) > max_history:
-                st.session_state.temperature_history[selected_forest] = st.session_state.temperature_history[selected_forest][-max_history:]
+            append_reading(
+                forest_history,
+                current_time,
+                weather_data['current_temp'],
+                weather_data['humidity'],
+                weather_data['wind_speed'],
+                max_history
+            )
 
 # Display the main dashboard in 3 columns
 col1, col2 = st.columns([1, 1])
@@ -135,8 +213,8 @@ with col1:
         data = st.session_state.current_temp_data
         
         # Temperature gauge
-        fig = create_temperature_gauge(
-            data['current_temp'], 
+        fig = build_temperature_gauge(
+            round(data['current_temp'], 1), 
             warning_threshold, 
             danger_threshold
         )
@@ -186,8 +264,8 @@ with col2:
     if st.session_state.current_temp_data:
         # Create and display map
         lat, lon = forest_locations[selected_forest]
-        temp_data = st.session_state.current_temp_data['current_temp']
-        map_fig = create_plotly_map(
+        temp_data = round(st.session_state.current_temp_data['current_temp'], 1)
+        map_fig = build_temperature_map(
             lat, lon, temp_data, 
             warning_threshold, danger_threshold,
             selected_forest
@@ -197,74 +275,39 @@ with col2:
         st.info("Map data unavailable. Please refresh.")
 
 # Historical data section with animation
-st.markdown("""
-<style>
-@keyframes slide-in {
-    0% { transform: translateX(-100%); opacity: 0; }
-    100% { transform: translateX(0); opacity: 1; }
-}
-.animated-header {
-    animation: slide-in 1.5s ease-out;
-}
-</style>
-<div class="animated-header">
-    <h3>Temperature History</h3>
-</div>
-""", unsafe_allow_html=True)
-
-if selected_forest in st.session_state.temperature_history and st.session_state.temperature_history[selected_forest]:
-    history_data = st.session_state.temperature_history[selected_forest]
-    
-    # Convert to dataframe for plotting
-    history_df = pd.DataFrame(history_data)
-    
-    # Plot temperature history with animation
-    fig = plot_temperature_history(
-        history_df, 
-        warning_threshold, 
+st.markdown(HISTORY_HEADER_HTML, unsafe_allow_html=True)
+
+if forest_history['size']:
+    # Rebuild the chart only when the readings or thresholds have changed; the
+    # newest timestamp (the slot behind the write head) identifies the readings
+    chart_key = (
+        selected_forest,
+        forest_history['size'],
+        forest_history['timestamp'][forest_history['head'] - 1],
+        warning_threshold,
         danger_threshold
     )
-    
-    # Add frame-by-frame animation to the plot
-    frames = []
-    for i in range(1, len(history_df) + 1):
-        subset = history_df.iloc[:i]
-        if not subset.empty:
-            frame_fig = go.Frame(
-                data=[go.Scatter(
-                    x=subset['timestamp'], 
-                    y=subset['temperature'],
-                    mode='lines+markers',
-                    line=dict(color='#1f77b4', width=3),
-                    marker=dict(size=6)
-                )],
-                name=f"frame{i}"
-            )
-            frames.append(frame_fig)
-    
-    if frames:
-        fig.frames = frames
-        fig.update_layout(
-            updatemenus=[{
-                'type': 'buttons',
-                'showactive': False,
-                'buttons': [{
-                    'label': 'Play',
-                    'method': 'animate',
-                    'args': [None, {'frame': {'duration': 100, 'redraw': True}, 'fromcurrent': True}]
-                }],
-                'x': 0.1,
-                'y': 0
-            }]
+    if st.session_state.get('history_chart_key') != chart_key:
+        st.session_state.history_chart = plot_temperature_history(
+            history_to_frame(forest_history), 
+            warning_threshold, 
+            danger_threshold
         )
+        st.session_state.history_chart_key = chart_key
     
-    st.plotly_chart(fig, use_container_width=True)
+    st.plotly_chart(st.session_state.history_chart, use_container_width=True)
     
     # Show raw data table if requested
     if st.checkbox("Show Raw Temperature Data"):
-        display_df = history_df.copy()
-        display_df['timestamp'] = display_df['timestamp'].dt.strftime('%Y-%m-%d %H:%M')
-        st.dataframe(display_df, use_container_width=True)
+        # Format timestamps in the table itself rather than copying the frame to strings
+        st.dataframe(
+            history_to_frame(forest_history),
+            use_container_width=True,
+            column_config={
+                'timestamp': st.column_config.DatetimeColumn(format="YYYY-MM-DD HH:mm"),
+                'temperature': st.column_config.NumberColumn(format="%.1f")
+            }
+        )
 else:
     st.info("No historical data available yet. Data will appear after multiple refreshes.")
 
@@ -319,54 +362,11 @@ progress_percent = 100 - (time_remaining / refresh_interval * 100)
 
 # Create an animated progress bar for the time until next update
 footer_html = f"""
-<style>
-@keyframes pulse {{
-    0% {{ opacity: 0.7; }}
-    50% {{ opacity: 1; }}
-    100% {{ opacity: 0.7; }}
-}}
-
-.footer-container {{
-    margin-top: 20px;
-    padding: 10px;
-    border-radius: 5px;
-    background-color: #f0f0f0;
-}}
-
-.update-progress {{
-    height: 5px;
-    background-color: #dcdcdc;
-    border-radius: 5px;
-    margin-top: 10px;
-    position: relative;
-}}
-
-.update-progress-bar {{
-    height: 100%;
-    width: {progress_percent}%;
-    background-color: #2E8B57;
-    border-radius: 5px;
-    animation: pulse 2s infinite;
-}}
-
-.footer-text {{
-    margin-bottom: 5px;
-    font-weight: bold;
-}}
-
-.time-info {{
-    display: flex;
-    justify-content: space-between;
-    font-size: 0.8rem;
-    color: #666;
-}}
-</style>
-
 <div class="footer-container">
     <div class="footer-text">Forest Temperature Monitoring System</div>
-    <div>Last updated: {st.session_state.last_refresh.strftime('%Y-%m-%d %H:%M:%S')} - Next update in: {time_remaining:.1f} minutes</div>
+    <div>Last updated: {st.session_state.last_refresh.item().strftime('%Y-%m-%d %H:%M:%S')} - Next update in: {time_remaining:.1f} minutes</div>
     <div class="update-progress">
-        <div class="update-progress-bar"></div>
+        <div class="update-progress-bar" style="width: {progress_percent}%;"></div>
     </div>
     <div class="time-info">
         <span>Just updated</span>
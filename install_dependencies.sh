@@ -13,6 +13,7 @@ pip uninstall -y streamlit-folium folium
 
 # Install specific versions one by one to avoid conflicts
 pip install numpy==1.24.3
+pip install orjson==3.9.10
 pip install pandas==2.0.3
 pip install requests==2.31.0
 pip install streamlit==1.32.0
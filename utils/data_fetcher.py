@@ -1,21 +1,37 @@
-import requests
-import json
-import os
 from datetime import datetime, timedelta
-import random  # Only used for simulating wind and humidity values
+from functools import lru_cache
+from types import MappingProxyType
+import numpy as np
+
+# Forest locations are static, so the mapping is built once at import and shared
+# read-only across Streamlit reruns instead of being rebuilt on every call.
+_FOREST_LOCATIONS = MappingProxyType({
+    # Focus on Indian Forests as per project requirements
+    "Jim Corbett National Park, India": (29.5300, 78.7742),
+    "Nagarhole National Park, India": (12.0438, 76.1440),
+    "Bandipur National Park, India": (11.6720, 76.6350),
+    "Kaziranga National Park, India": (26.5789, 93.1700),
+    "Sundarbans, India": (21.9497, 88.9000)
+})
+
+# (n, 2) array of the forest latitudes/longitudes, in the same order as
+# _FOREST_LOCATIONS, for vectorized per-forest computations
+_FOREST_COORDS = np.array(list(_FOREST_LOCATIONS.values()))
+_FOREST_COORDS.flags.writeable = False
+
+# Time-of-day terms of the fallback model only depend on the hour, so they are
+# tabulated once for all 24 hours
+_HOURS = np.arange(24)
+_HOUR_TEMP_ADJUSTMENT = -8 + (16 * (1 - np.abs((_HOURS - 14) / 12)))  # Peak at 2 PM
+_HOUR_TEMP_CHANGE = np.round((_HOURS % 3 - 1) * 0.8, 1)
 
 def get_forest_locations():
     """
     Returns a dictionary of forest locations with their coordinates.
+
+    The returned mapping is a read-only view of a module-level constant.
     """
-    return {
-        # Focus on Indian Forests as per project requirements
-        "Jim Corbett National Park, India": (29.5300, 78.7742),
-        "Nagarhole National Park, India": (12.0438, 76.1440),
-        "Bandipur National Park, India": (11.6720, 76.6350),
-        "Kaziranga National Park, India": (26.5789, 93.1700),
-        "Sundarbans, India": (21.9497, 88.9000)
-    }
+    return _FOREST_LOCATIONS
 
 def fetch_weather_data(lat, lon):
     """
@@ -31,44 +47,139 @@ def fetch_weather_data(lat, lon):
     # Note: The OpenWeatherMap API key is not working, so we're using the fallback data generation
     # mechanism to ensure the app works consistently
     
-    # Use deterministic data generation based on location and time
-    return _generate_fallback_data(lat, lon)
+    # Use deterministic data generation based on location and time.
+    # The generated values only change hour-to-hour, so results are memoized
+    # per (lat, lon, hour); a copy is returned so callers cannot mutate the cache.
+    return dict(_generate_fallback_data(lat, lon, datetime.now().hour))
+
+def fetch_all_weather_data():
+    """
+    Fetches current weather data for every monitored forest at once.
+    
+    Returns:
+        dict: Weather data (as returned by fetch_weather_data) keyed by forest name
+    """
+    return dict(zip(_FOREST_LOCATIONS, fetch_weather_bulk(_FOREST_COORDS)))
+
+def fetch_weather_bulk(points):
+    """
+    Fetches current weather data for several locations at once.
+    
+    Args:
+        points (iterable): (lat, lon) pairs of the locations
+        
+    Returns:
+        list: Weather data (as returned by fetch_weather_data) for each location, in order
+    """
+    coords = np.asarray(list(points), dtype=np.float64).reshape(-1, 2)
+    if not coords.size:
+        return []
+    return _fallback_records(coords[:, 0], coords[:, 1], datetime.now().hour)
+
+def haversine_vec(lat0, lon0, lats, lons, radius=6371.0):
+    """
+    Computes great-circle distances from one point to many points at once.
+    
+    Args:
+        lat0 (float): Latitude of the reference point
+        lon0 (float): Longitude of the reference point
+        lats (numpy.ndarray): Latitudes of the other points
+        lons (numpy.ndarray): Longitudes of the other points
+        radius (float): Radius of the Earth in km
+        
+    Returns:
+        numpy.ndarray: Distance in km to each of the other points
+    """
+    phi0 = np.radians(lat0)
+    phi = np.radians(lats)
+    d_phi = phi - phi0
+    d_lambda = np.radians(lons) - np.radians(lon0)
+    a = np.sin(d_phi / 2) ** 2 + np.cos(phi0) * np.cos(phi) * np.sin(d_lambda / 2) ** 2
+    return 2 * radius * np.arcsin(np.sqrt(a))
 
-def _generate_fallback_data(lat, lon):
+def nearest_forest(lat, lon):
+    """
+    Finds the monitored forest closest to a location.
+    
+    Args:
+        lat (float): Latitude of the location
+        lon (float): Longitude of the location
+        
+    Returns:
+        tuple: Forest name and its distance from the location in km
+    """
+    distances = haversine_vec(lat, lon, _FOREST_COORDS[:, 0], _FOREST_COORDS[:, 1])
+    index = int(distances.argmin())
+    return list(_FOREST_LOCATIONS)[index], float(distances[index])
+
+def forests_within(lat, lon, km):
+    """
+    Lists the monitored forests within a distance of a location.
+    
+    Args:
+        lat (float): Latitude of the location
+        lon (float): Longitude of the location
+        km (float): Maximum distance in km
+        
+    Returns:
+        dict: Distance in km keyed by forest name, nearest first
+    """
+    distances = haversine_vec(lat, lon, _FOREST_COORDS[:, 0], _FOREST_COORDS[:, 1])
+    names = list(_FOREST_LOCATIONS)
+    return {
+        names[index]: float(distances[index])
+        for index in np.argsort(distances)
+        if distances[index] <= km
+    }
+
+@lru_cache(maxsize=256)
+def _generate_fallback_data(lat, lon, hour):
     """
     Generates fallback data when the API fails.
-    This uses a deterministic algorithm based on coordinates
-    to simulate realistic temperature patterns.
+    This uses a deterministic algorithm based on coordinates and the hour
+    of day to simulate realistic temperature patterns.
+    """
+    return _fallback_records(np.array([lat]), np.array([lon]), hour)[0]
+
+def _fallback_records(lats, lons, hour):
+    """
+    Computes fallback weather values for arrays of coordinates with NumPy.
+    
+    Args:
+        lats (numpy.ndarray): Latitudes of the locations
+        lons (numpy.ndarray): Longitudes of the locations
+        hour (int): Hour of day (0-23)
+        
+    Returns:
+        list: One weather data dict per location
     """
     # Use the latitude to determine base temperature (cooler at higher latitudes)
     # This creates a deterministic pattern based on location
-    base_temp = 30 - abs(lat) * 0.5
+    base_temp = 30 - np.abs(lats) * 0.5
     
     # Adjust for time of day (cooler at night, warmer during day)
-    hour = datetime.now().hour
-    time_factor = abs((hour - 14) / 12)  # Peak at 2 PM
-    temp_adjustment = -8 + (16 * (1 - time_factor))
+    temp_adjustment = _HOUR_TEMP_ADJUSTMENT[hour]
     
-    # Calculate final temperature
-    current_temp = round(base_temp + temp_adjustment, 1)
-    
-    # Ensure temperature is within realistic bounds
-    current_temp = max(min(current_temp, 45), -10)
+    # Calculate final temperature, kept within realistic bounds
+    current_temp = np.clip(np.round(base_temp + temp_adjustment, 1), -10, 45)
     
     # Calculate humidity (higher near equator and water bodies)
-    humidity_base = 60 + (90 - abs(lat)) * 0.5
-    humidity = min(95, max(30, round(humidity_base)))
+    humidity_base = 60 + (90 - np.abs(lats)) * 0.5
+    humidity = np.clip(np.round(humidity_base), 30, 95).astype(np.int64)
     
     # Wind speed varies by location
-    wind_base = abs(lon) % 10
-    wind_speed = round(wind_base + 2, 1)
+    wind_base = np.abs(lons) % 10
+    wind_speed = np.round(wind_base + 2, 1)
     
     # Slight temperature variation for change indicator
-    temp_change = round((hour % 3 - 1) * 0.8, 1)
+    temp_change = float(_HOUR_TEMP_CHANGE[hour])
     
-    return {
-        'current_temp': current_temp,
-        'humidity': humidity,
-        'wind_speed': wind_speed,
-        'temp_change': temp_change
-    }
+    return [
+        {
+            'current_temp': temp,
+            'humidity': hum,
+            'wind_speed': wind,
+            'temp_change': temp_change
+        }
+        for temp, hum, wind in zip(current_temp.tolist(), humidity.tolist(), wind_speed.tolist())
+    ]
@@ -0,0 +1,52 @@
+import numpy as np
+
+def lttb_indices(x, y, n_out):
+    """
+    Selects the points to keep when downsampling a series for plotting using
+    the Largest-Triangle-Three-Buckets algorithm, which preserves the visual
+    shape (peaks and dips) of the series.
+
+    Args:
+        x (numpy.ndarray): Monotonic numeric x values (e.g. epoch timestamps)
+        y (numpy.ndarray): Values to downsample
+        n_out (int): Number of points to keep
+
+    Returns:
+        numpy.ndarray: Sorted integer indices of the selected points
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+
+    # First and last points are always kept; the interior is split into
+    # n_out - 2 buckets and one point is chosen from each
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+
+    selected = np.empty(n_out, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+
+    previous = 0
+    for bucket in range(n_out - 2):
+        start, end = edges[bucket], edges[bucket + 1]
+
+        # Average of the next bucket (or the final point) anchors the triangle
+        if bucket + 2 < len(edges):
+            next_start, next_end = edges[bucket + 1], edges[bucket + 2]
+        else:
+            next_start, next_end = n - 1, n
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        # Keep the point forming the largest triangle with the previous pick
+        area = np.abs(
+            (x[previous] - avg_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (avg_y - y[previous])
+        )
+        previous = start + int(area.argmax())
+        selected[bucket + 1] = previous
+
+    return selected
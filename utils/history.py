@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+
+HISTORY_COLUMNS = ('timestamp', 'temperature', 'humidity', 'wind_speed')
+
+def create_history(capacity):
+    """
+    Creates an empty temperature history stored as preallocated column arrays.
+
+    The arrays are used as a circular buffer: 'head' is the next slot to write
+    and 'size' is the number of readings currently retained. 'frame' holds the
+    DataFrame built from the buffer until the next reading is appended.
+    Temperatures are stored as float32, which is ample for readings reported
+    to 0.1°C and halves the column's size.
+
+    Args:
+        capacity (int): Maximum number of readings the buffer can hold
+
+    Returns:
+        dict: Column arrays plus the 'head', 'size' and 'frame' bookkeeping fields
+    """
+    return {
+        'timestamp': np.empty(capacity, dtype='datetime64[s]'),
+        'temperature': np.empty(capacity, dtype=np.float32),
+        'humidity': np.empty(capacity, dtype=np.int64),
+        'wind_speed': np.empty(capacity, dtype=np.float64),
+        'head': 0,
+        'size': 0,
+        'frame': None
+    }
+
+def append_reading(history, timestamp, temperature, humidity, wind_speed, max_size):
+    """
+    Writes a reading into the history buffer, dropping the oldest readings
+    once more than max_size are retained.
+
+    Args:
+        history (dict): History created by create_history
+        timestamp (numpy.datetime64): Time of the reading
+        temperature (float): Temperature in °C
+        humidity (int): Relative humidity in percent
+        wind_speed (float): Wind speed in km/h
+        max_size (int): Number of most recent readings to keep; callers size the
+            buffer (see create_history) so this never exceeds its capacity
+    """
+    capacity = len(history['timestamp'])
+    head = history['head']
+
+    history['timestamp'][head] = timestamp
+    history['temperature'][head] = temperature
+    history['humidity'][head] = humidity
+    history['wind_speed'][head] = wind_speed
+
+    history['head'] = (head + 1) % capacity
+    history['size'] = min(history['size'] + 1, max_size, capacity)
+    history['frame'] = None
+
+def history_to_frame(history):
+    """
+    Builds a DataFrame of the retained readings in chronological order.
+
+    The DataFrame is only materialized on the first call after an append and
+    reused afterwards, so reruns that don't add readings skip the rebuild.
+    Callers must not modify the returned DataFrame.
+
+    Args:
+        history (dict): History created by create_history
+
+    Returns:
+        pandas.DataFrame: Columns timestamp, temperature, humidity and wind_speed
+    """
+    if history['frame'] is not None:
+        return history['frame']
+
+    capacity = len(history['timestamp'])
+    size = history['size']
+
+    # Oldest retained reading sits 'size' slots behind the write head
+    order = (history['head'] - size + np.arange(size)) % capacity
+
+    history['frame'] = pd.DataFrame({column: history[column][order] for column in HISTORY_COLUMNS})
+    return history['frame']
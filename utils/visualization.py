@@ -2,16 +2,53 @@ import folium
 from folium.plugins import HeatMap, MeasureControl, Fullscreen, TimestampedGeoJson
 import plotly.express as px
 import plotly.graph_objects as go
+import plotly.io as pio
 from plotly.subplots import make_subplots
 import pandas as pd
 import numpy as np
 import base64
+import json
 from datetime import datetime, timedelta
+from functools import lru_cache
+
+from utils.downsampling import lttb_indices
+
+# Serialize figures with orjson (st.plotly_chart goes through plotly.io.to_json),
+# which encodes numpy arrays and datetimes natively instead of via PlotlyJSONEncoder
+pio.json.config.default_engine = 'orjson'
+
+# Longer histories are downsampled to about as many points as a chart can show
+MAX_HISTORY_POINTS = 1000
+
+# Above this many points the markers just clutter the line, so only the line is drawn
+MAX_MARKER_POINTS = 200
+
+# The heat map uses the same disc of grid points around every location: offsets
+# of up to 10 grid steps (0.01° each) with weights decaying linearly with distance
+_HEAT_I, _HEAT_J = np.meshgrid(np.arange(-10, 11), np.arange(-10, 11), indexing='ij')
+_HEAT_SQUARED_DISTANCE = _HEAT_I * _HEAT_I + _HEAT_J * _HEAT_J
+_HEAT_MASK = _HEAT_SQUARED_DISTANCE <= 100  # exact integer test for distance <= 10
+_HEAT_DLAT = _HEAT_I[_HEAT_MASK] / 100
+_HEAT_DLON = _HEAT_J[_HEAT_MASK] / 100
+_HEAT_DECAY = 1 - np.sqrt(_HEAT_SQUARED_DISTANCE[_HEAT_MASK]) / 10
+
+# Marker popup content: location name, temperature and status
+_POPUP_TPL = "<strong>%s</strong><br>Temperature: %s°C<br>Status: %s"
+
+# Marker icon: a status-colored disc with a thermometer glyph, drawn as plain HTML
+_MARKER_ICON_TPL = (
+    '<div style="background:%s;border-radius:50%%;width:24px;height:24px;'
+    'color:white;text-align:center;line-height:24px;">'
+    '<i class="fa fa-thermometer-full"></i></div>'
+)
 
 def create_temperature_map(lat, lon, temperature, warning_threshold, danger_threshold, location_name):
     """
     Creates an interactive map with temperature data for the forest location.
     
+    A new map is built on every call, since rendering a folium map mutates it.
+    Use create_temperature_map_html to reuse the rendered output.
+    
     Args:
         lat (float): Latitude of the location
         lon (float): Longitude of the location
@@ -23,8 +60,9 @@ def create_temperature_map(lat, lon, temperature, warning_threshold, danger_thre
     Returns:
         folium.Map: Interactive map with temperature data
     """
-    # Create a map centered at the forest location
-    m = folium.Map(location=[lat, lon], zoom_start=10)
+    # Create a map centered at the forest location; vector layers (the boundary
+    # circle) are drawn on a canvas instead of as SVG DOM nodes
+    m = folium.Map(location=[lat, lon], zoom_start=10, prefer_canvas=True)
     
     # Determine color based on temperature thresholds
     if temperature >= danger_threshold:
@@ -40,9 +78,10 @@ def create_temperature_map(lat, lon, temperature, warning_threshold, danger_thre
     # Add a marker for the forest location with temperature information
     folium.Marker(
         location=[lat, lon],
-        popup=f"<strong>{location_name}</strong><br>Temperature: {temperature}°C<br>Status: {temp_status}",
+        # Lazy popups are only rendered in the browser when first opened
+        popup=folium.Popup(_POPUP_TPL % (location_name, temperature, temp_status), lazy=True),
         tooltip=f"{location_name}: {temperature}°C",
-        icon=folium.Icon(color=color, icon='thermometer-full', prefix='fa')
+        icon=folium.DivIcon(html=_MARKER_ICON_TPL % color, icon_size=(24, 24), icon_anchor=(12, 12))
     ).add_to(m)
     
     # Create a heat map effect around the location based on temperature
@@ -52,21 +91,21 @@ def create_temperature_map(lat, lon, temperature, warning_threshold, danger_thre
     )
     
     # Generate heat map data points
-    heat_data = []
     base_weight = max(0, (temperature - 15) / 5)  # Normalize weight
     
-    # Create a grid of points around the forest location for the heat map
-    for i in range(-10, 11):
-        for j in range(-10, 11):
-            # Distance from center point
-            distance = (i**2 + j**2) ** 0.5
-            if distance <= 10:
-                # Weight decreases with distance from center
-                weight = base_weight * (1 - distance/10)
-                heat_data.append([lat + i * 0.01, lon + j * 0.01, weight * heat_intensity])
+    # At or below 15°C every weight is zero and the heat map would be empty
+    if base_weight > 0:
+        # Place the precomputed grid of points around the forest location;
+        # weight decreases with distance from center. Values are rounded to 5
+        # decimals (about 1 m) to keep float noise out of the serialized points.
+        heat_data = np.column_stack([
+            lat + _HEAT_DLAT,
+            lon + _HEAT_DLON,
+            base_weight * _HEAT_DECAY * heat_intensity
+        ]).round(5).tolist()
     
-    # Add heat map to the map
-    HeatMap(heat_data, radius=15, blur=10, max_zoom=10).add_to(m)
+        # Add heat map to the map
+        HeatMap(heat_data, radius=15, blur=10, max_zoom=10).add_to(m)
     
     # Add forest boundary (simplified as a circle)
     folium.Circle(
@@ -80,82 +119,153 @@ def create_temperature_map(lat, lon, temperature, warning_threshold, danger_thre
     
     return m
 
-def plot_temperature_history(history_df, warning_threshold, danger_threshold):
+def create_temperature_map_html(lat, lon, temperature, warning_threshold, danger_threshold, location_name):
     """
-    Creates a time series plot of temperature history.
+    Renders the temperature map to a standalone HTML document.
+    
+    Rendering the folium templates is the bulk of the cost of showing a map, so
+    the HTML string is cached on the inputs (coordinates rounded to 3 decimals
+    and the temperature to 1) and can be embedded directly, e.g. with
+    streamlit.components.v1.html. Each cache miss renders a freshly built map.
     
     Args:
-        history_df (pandas.DataFrame): DataFrame containing temperature history data
+        lat (float): Latitude of the location
+        lon (float): Longitude of the location
+        temperature (float): Current temperature value
         warning_threshold (float): Temperature threshold for warning alert
         danger_threshold (float): Temperature threshold for danger alert
+        location_name (str): Name of the forest location
         
     Returns:
-        plotly.graph_objects.Figure: Interactive time series plot
+        str: HTML of the rendered map
     """
-    # Create figure
-    fig = go.Figure()
-    
-    # Add temperature line
-    fig.add_trace(go.Scatter(
-        x=history_df['timestamp'],
-        y=history_df['temperature'],
-        mode='lines+markers',
-        name='Temperature (°C)',
-        line=dict(color='#1f77b4', width=3),
-        marker=dict(size=6)
-    ))
-    
-    # Add threshold lines
-    fig.add_shape(
-        type="line",
-        x0=history_df['timestamp'].min(),
-        y0=warning_threshold,
-        x1=history_df['timestamp'].max(),
-        y1=warning_threshold,
-        line=dict(color="orange", width=2, dash="dash"),
-    )
-    
-    fig.add_shape(
-        type="line",
-        x0=history_df['timestamp'].min(),
-        y0=danger_threshold,
-        x1=history_df['timestamp'].max(),
-        y1=danger_threshold,
-        line=dict(color="red", width=2, dash="dash"),
-    )
-    
-    # Add annotations
-    fig.add_annotation(
-        x=history_df['timestamp'].max(),
-        y=warning_threshold,
-        text="Warning Threshold",
-        showarrow=False,
-        yshift=10,
-        font=dict(color="orange")
+    return _rendered_map_html(
+        round(lat, 3), round(lon, 3), round(temperature, 1),
+        warning_threshold, danger_threshold, location_name
     )
+
+@lru_cache(maxsize=32)
+def _rendered_map_html(lat, lon, temperature, warning_threshold, danger_threshold, location_name):
+    m = create_temperature_map(lat, lon, temperature, warning_threshold, danger_threshold, location_name)
+    return m.get_root().render()
+
+@lru_cache(maxsize=32)
+def _history_base_figure(warning_threshold, danger_threshold):
+    """
+    Builds the threshold lines, annotations and layout of the history chart.
     
-    fig.add_annotation(
-        x=history_df['timestamp'].max(),
-        y=danger_threshold,
-        text="Danger Threshold",
-        showarrow=False,
-        yshift=10,
-        font=dict(color="red")
-    )
+    The threshold lines span the full plot width (paper coordinates), so the
+    template only depends on the thresholds and is cached per threshold pair.
+    Callers must copy the returned figure before adding traces to it.
     
-    # Set chart layout
-    fig.update_layout(
+    Args:
+        warning_threshold (float): Temperature threshold for warning alert
+        danger_threshold (float): Temperature threshold for danger alert
+        
+    Returns:
+        plotly.graph_objects.Figure: Figure without data traces
+    """
+    # Threshold lines and their labels, set in a single layout spec
+    layout = dict(
+        shapes=[
+            dict(
+                type="line",
+                xref="paper",
+                x0=0,
+                y0=warning_threshold,
+                x1=1,
+                y1=warning_threshold,
+                line=dict(color="orange", width=2, dash="dash"),
+            ),
+            dict(
+                type="line",
+                xref="paper",
+                x0=0,
+                y0=danger_threshold,
+                x1=1,
+                y1=danger_threshold,
+                line=dict(color="red", width=2, dash="dash"),
+            ),
+        ],
+        annotations=[
+            dict(
+                xref="paper",
+                x=1,
+                xanchor="right",
+                y=warning_threshold,
+                text="Warning Threshold",
+                showarrow=False,
+                yshift=10,
+                font=dict(color="orange")
+            ),
+            dict(
+                xref="paper",
+                x=1,
+                xanchor="right",
+                y=danger_threshold,
+                text="Danger Threshold",
+                showarrow=False,
+                yshift=10,
+                font=dict(color="red")
+            ),
+        ],
         title="Temperature History (Last 24 hours)",
         xaxis_title="Time",
         yaxis_title="Temperature (°C)",
         hovermode="x unified",
         legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+        # Keep the user's zoom/pan when the chart is redrawn on a rerun
+        uirevision="temperature-history",
+    )
+    
+    fig = go.Figure(dict(layout=layout))
+    
+    return fig
+
+def plot_temperature_history(history_df, warning_threshold, danger_threshold):
+    """
+    Creates a time series plot of temperature history.
+    
+    Args:
+        history_df (pandas.DataFrame): DataFrame containing temperature history data
+        warning_threshold (float): Temperature threshold for warning alert
+        danger_threshold (float): Temperature threshold for danger alert
+        
+    Returns:
+        plotly.graph_objects.Figure: Interactive time series plot
+    """
+    # Downsample long histories so the browser payload stays bounded
+    if len(history_df) > MAX_HISTORY_POINTS:
+        keep = lttb_indices(
+            history_df['timestamp'].to_numpy().astype(np.int64),
+            history_df['temperature'].to_numpy(),
+            MAX_HISTORY_POINTS
+        )
+        history_df = history_df.iloc[keep]
+    
+    # Add temperature line (WebGL trace so long histories stay responsive); the
+    # columns are passed as ndarrays so Plotly doesn't copy them as Series
+    temperature_trace = dict(
+        type='scattergl',
+        x=history_df['timestamp'].to_numpy(),
+        y=history_df['temperature'].to_numpy(),
+        mode='lines+markers' if len(history_df) <= MAX_MARKER_POINTS else 'lines',
+        name='Temperature (°C)',
+        line=dict(color='#1f77b4', width=3),
+        marker=dict(size=6)
     )
     
     # Make sure y-axis covers appropriate temperature range with some padding
-    y_min = min(min(history_df['temperature']), warning_threshold) - 5
-    y_max = max(max(history_df['temperature']), danger_threshold) + 5
-    fig.update_yaxes(range=[y_min, y_max])
+    # (readings are reported to 0.1°C; rounding drops float32 representation noise)
+    temperatures = history_df['temperature'].to_numpy()
+    y_min = min(round(float(temperatures.min()), 1), warning_threshold) - 5
+    y_max = max(round(float(temperatures.max()), 1), danger_threshold) + 5
+    
+    # Copy the cached threshold template and add the data without running
+    # Plotly's property validators
+    fig = go.Figure(_history_base_figure(warning_threshold, danger_threshold), _validate=False)
+    fig.add_trace(temperature_trace)
+    fig.layout.yaxis.range = [y_min, y_max]
     
     return fig
 
@@ -163,6 +273,10 @@ def create_temperature_gauge(temperature, warning_threshold, danger_threshold):
     """
     Creates a gauge chart showing current temperature with color-coded thresholds.
     
+    The figure spec is cached as JSON per temperature (rounded to 0.1°C) and
+    thresholds, and each call builds a new figure from it, so callers are free
+    to modify the result.
+    
     Args:
         temperature (float): Current temperature value
         warning_threshold (float): Temperature threshold for warning alert
@@ -171,75 +285,53 @@ def create_temperature_gauge(temperature, warning_threshold, danger_threshold):
     Returns:
         plotly.graph_objects.Figure: Gauge chart
     """
+    spec = json.loads(_gauge_spec_json(round(temperature, 1), warning_threshold, danger_threshold))
+    
+    # Build the figure from one spec without running Plotly's property validators
+    return go.Figure(spec, _validate=False)
+
+@lru_cache(maxsize=128)
+def _gauge_spec_json(temperature, warning_threshold, danger_threshold):
     # Determine the maximum value for the gauge (at least 10 degrees above the current temperature)
     max_temp = max(50, temperature + 10, danger_threshold + 5)
     
-    # Create the gauge figure with animation
-    fig = go.Figure()
-    
-    # Add animated trace that goes from 0 to the actual temperature
-    for i in range(0, int(temperature) + 1, max(1, int(temperature // 10))):
-        fig.add_trace(
-            go.Indicator(
-                mode="gauge+number",
-                value=i,
-                domain={'x': [0, 1], 'y': [0, 1]},
-                title={'text': "Current Temperature (°C)"},
-                gauge={
-                    'axis': {'range': [0, max_temp]},
-                    'bar': {'color': "darkblue"},
-                    'steps': [
-                        {'range': [0, warning_threshold], 'color': "lightgreen"},
-                        {'range': [warning_threshold, danger_threshold], 'color': "orange"},
-                        {'range': [danger_threshold, max_temp], 'color': "red"}
-                    ],
-                    'threshold': {
-                        'line': {'color': "red", 'width': 4},
-                        'thickness': 0.75,
-                        'value': i
-                    }
-                },
-                visible=False
-            )
-        )
-    
-    # Add the final gauge with the actual temperature
-    fig.add_trace(
-        go.Indicator(
-            mode="gauge+number",
-            value=temperature,
-            domain={'x': [0, 1], 'y': [0, 1]},
-            title={'text': "Current Temperature (°C)"},
-            gauge={
-                'axis': {'range': [0, max_temp]},
-                'bar': {'color': "darkblue"},
-                'steps': [
-                    {'range': [0, warning_threshold], 'color': "lightgreen"},
-                    {'range': [warning_threshold, danger_threshold], 'color': "orange"},
-                    {'range': [danger_threshold, max_temp], 'color': "red"}
-                ],
-                'threshold': {
-                    'line': {'color': "red", 'width': 4},
-                    'thickness': 0.75,
-                    'value': temperature
-                }
+    # Single Indicator trace showing the actual temperature
+    indicator = dict(
+        type='indicator',
+        mode="gauge+number",
+        value=temperature,
+        domain={'x': [0, 1], 'y': [0, 1]},
+        title={'text': "Current Temperature (°C)"},
+        gauge={
+            'axis': {'range': [0, max_temp]},
+            'bar': {'color': "darkblue"},
+            'steps': [
+                {'range': [0, warning_threshold], 'color': "lightgreen"},
+                {'range': [warning_threshold, danger_threshold], 'color': "orange"},
+                {'range': [danger_threshold, max_temp], 'color': "red"}
+            ],
+            'threshold': {
+                'line': {'color': "red", 'width': 4},
+                'thickness': 0.75,
+                'value': temperature
             }
-        )
+        }
     )
     
-    # Create frames for animation
-    frames = []
-    for i in range(len(fig.data)):
-        frame_data = []
-        for j in range(len(fig.data)):
-            visible = True if j == i else False
-            frame_data.append(go.Indicator(visible=visible))
-        frames.append(go.Frame(data=frame_data, name=str(i)))
-    
-    fig.frames = frames
+    # Create frames for animation: each frame only updates the value of the
+    # single gauge trace, stepping from 0 up to the actual temperature
+    steps = list(range(0, int(temperature) + 1, max(1, int(temperature // 10))))
+    steps.append(temperature)
+    frames = [
+        dict(
+            data=[dict(type='indicator', value=value, gauge={'threshold': {'value': value}})],
+            name=str(i)
+        )
+        for i, value in enumerate(steps)
+    ]
     
     # Add animation buttons
-    fig.update_layout(
+    layout = dict(
         updatemenus=[{
             'type': 'buttons',
             'showactive': False,
@@ -255,7 +347,75 @@ def create_temperature_gauge(temperature, warning_threshold, danger_threshold):
         margin=dict(l=10, r=10, t=50, b=50),
     )
     
-    return fig
+    return json.dumps(dict(data=[indicator], layout=layout, frames=frames))
+
+# HTML with embedded CSS animation for each icon band. Only the animation
+# duration varies between calls, so it is the single %s placeholder and the
+# keyframe percentages are escaped as %%.
+_ICON_TEMPLATES = {
+    'fire': """
+    <style>
+        
+        @keyframes pulse-fire {
+            0%% { transform: scale(1); opacity: 0.8; }
+            50%% { transform: scale(1.2); opacity: 1; }
+            100%% { transform: scale(1); opacity: 0.8; }
+        }
+        
+        .animated-icon-fire {
+            display: inline-block;
+            animation: pulse-fire %ss infinite;
+            color: red;
+            font-size: 3rem;
+        }
+    </style>
+    <div class="animated-icon-fire">
+        <i class="fas fa-fire"></i>
+    </div>
+    """,
+    'thermometer-three-quarters': """
+    <style>
+        
+        @keyframes shake-thermometer-three-quarters {
+            0%% { transform: rotate(0deg); }
+            25%% { transform: rotate(5deg); }
+            50%% { transform: rotate(0deg); }
+            75%% { transform: rotate(-5deg); }
+            100%% { transform: rotate(0deg); }
+        }
+        
+        .animated-icon-thermometer-three-quarters {
+            display: inline-block;
+            animation: shake-thermometer-three-quarters %ss infinite;
+            color: orange;
+            font-size: 3rem;
+        }
+    </style>
+    <div class="animated-icon-thermometer-three-quarters">
+        <i class="fas fa-thermometer-three-quarters"></i>
+    </div>
+    """,
+    'thermometer-quarter': """
+    <style>
+        
+        @keyframes fade-thermometer-quarter {
+            0%% { opacity: 0.7; }
+            50%% { opacity: 1; }
+            100%% { opacity: 0.7; }
+        }
+        
+        .animated-icon-thermometer-quarter {
+            display: inline-block;
+            animation: fade-thermometer-quarter %ss infinite;
+            color: green;
+            font-size: 3rem;
+        }
+    </style>
+    <div class="animated-icon-thermometer-quarter">
+        <i class="fas fa-thermometer-quarter"></i>
+    </div>
+    """
+}
 
 def add_animated_icon(temperature):
     """
@@ -272,57 +432,8 @@ def add_animated_icon(temperature):
     animation_speed = max(1, min(5, temperature / 10))  # Scale between 1-5 seconds
     
     if temperature >= 35:  # High temperature - fire icon
-        icon_color = "red"
-        icon_name = "fire"
-        animation = f"""
-        @keyframes pulse-{icon_name} {{
-            0% {{ transform: scale(1); opacity: 0.8; }}
-            50% {{ transform: scale(1.2); opacity: 1; }}
-            100% {{ transform: scale(1); opacity: 0.8; }}
-        }}
-        """
-        animation_style = f"animation: pulse-{icon_name} {animation_speed}s infinite;"
-    
+        return _ICON_TEMPLATES['fire'] % animation_speed
     elif temperature >= 25:  # Medium temperature - thermometer icon
-        icon_color = "orange"
-        icon_name = "thermometer-three-quarters"
-        animation = f"""
-        @keyframes shake-{icon_name} {{
-            0% {{ transform: rotate(0deg); }}
-            25% {{ transform: rotate(5deg); }}
-            50% {{ transform: rotate(0deg); }}
-            75% {{ transform: rotate(-5deg); }}
-            100% {{ transform: rotate(0deg); }}
-        }}
-        """
-        animation_style = f"animation: shake-{icon_name} {animation_speed}s infinite;"
-    
+        return _ICON_TEMPLATES['thermometer-three-quarters'] % animation_speed
     else:  # Low temperature - normal thermometer
-        icon_color = "green"
-        icon_name = "thermometer-quarter"
-        animation = f"""
-        @keyframes fade-{icon_name} {{
-            0% {{ opacity: 0.7; }}
-            50% {{ opacity: 1; }}
-            100% {{ opacity: 0.7; }}
-        }}
-        """
-        animation_style = f"animation: fade-{icon_name} {animation_speed*2}s infinite;"
-    
-    # Generate the HTML with embedded CSS animation
-    html = f"""
-    <style>
-        {animation}
-        .animated-icon-{icon_name} {{
-            display: inline-block;
-            {animation_style}
-            color: {icon_color};
-            font-size: 3rem;
-        }}
-    </style>
-    <div class="animated-icon-{icon_name}">
-        <i class="fas fa-{icon_name}"></i>
-    </div>
-    """
-    
-    return html
+        return _ICON_TEMPLATES['thermometer-quarter'] % (animation_speed * 2)
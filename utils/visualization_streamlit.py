@@ -1,9 +1,21 @@
-import plotly.express as px
 import plotly.graph_objects as go
+import plotly.io as pio
 from plotly.subplots import make_subplots
-import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
+from functools import lru_cache
+
+from utils.downsampling import lttb_indices
+
+# Serialize figures with orjson (st.plotly_chart goes through plotly.io.to_json),
+# which encodes numpy arrays and datetimes natively instead of via PlotlyJSONEncoder
+pio.json.config.default_engine = 'orjson'
+
+# Longer histories are downsampled to about as many points as a chart can show
+MAX_HISTORY_POINTS = 1000
+
+# Above this many points the markers just clutter the line, so only the line is drawn
+MAX_MARKER_POINTS = 200
 
 def create_plotly_map(lat, lon, temperature, warning_threshold, danger_threshold, location_name):
     """
@@ -32,56 +44,43 @@ def create_plotly_map(lat, lon, temperature, warning_threshold, danger_threshold
         color = 'green'
         temp_status = 'NORMAL'
     
-    # Create a dataframe with the location
-    df = pd.DataFrame({
-        'lat': [lat],
-        'lon': [lon],
-        'name': [location_name],
-        'temperature': [temperature],
-        'status': [temp_status]
-    })
-    
-    # Create the map
-    fig = px.scatter_mapbox(
-        df, 
-        lat='lat', 
-        lon='lon',
-        hover_name='name',
-        hover_data={'temperature': True, 'status': True, 'lat': False, 'lon': False},
-        color_discrete_sequence=[color],
-        zoom=9,
-        height=400,
+    # Location marker, with the same hover layout plotly.express would produce
+    marker_trace = dict(
+        type='scattermapbox',
+        lat=[lat],
+        lon=[lon],
+        mode='markers',
+        marker=dict(color=color),
+        hovertext=[location_name],
+        customdata=[[temperature, temp_status]],
+        hovertemplate="<b>%{hovertext}</b><br><br>temperature=%{customdata[0]}<br>status=%{customdata[1]}<extra></extra>",
+        name='',
+        showlegend=False
     )
     
     # Add forest boundary (as a circle on the map)
     # Generate points for a circle around the forest location
-    circle_points = []
-    for angle in range(0, 360, 10):
-        angle_rad = angle * np.pi / 180
-        # Approximate 5km radius in degrees (very rough approximation)
-        radius_deg = 5 / 111  # 1 degree is approximately 111 km
-        circle_lat = lat + radius_deg * np.sin(angle_rad)
-        circle_lon = lon + radius_deg * np.cos(angle_rad)
-        circle_points.append((circle_lat, circle_lon))
-    
-    # Extract circle coordinates
-    circle_lats = [p[0] for p in circle_points]
-    circle_lons = [p[1] for p in circle_points]
+    angles = np.deg2rad(np.arange(0, 360, 10))
+    # Approximate 5km radius in degrees (very rough approximation)
+    radius_deg = 5 / 111  # 1 degree is approximately 111 km
+    circle_lats = lat + radius_deg * np.sin(angles)
+    circle_lons = lon + radius_deg * np.cos(angles)
     
     # Add the circle as a line on the map
-    fig.add_trace(go.Scattermapbox(
+    circle_trace = dict(
+        type='scattermapbox',
         lat=circle_lats,
         lon=circle_lons,
         mode='lines',
         line=dict(width=2, color='green'),
         hoverinfo='skip',
         showlegend=False
-    ))
+    )
     
     # Configure mapbox
-    fig.update_layout(
-        mapbox_style="open-street-map",
+    layout = dict(
         mapbox=dict(
+            style="open-street-map",
             center=dict(lat=lat, lon=lon),
             zoom=9
         ),
@@ -89,6 +88,82 @@ def create_plotly_map(lat, lon, temperature, warning_threshold, danger_threshold
         height=400,
     )
     
+    # Build the figure from one spec without running Plotly's property validators
+    fig = go.Figure(dict(data=[marker_trace, circle_trace], layout=layout), _validate=False)
+    
+    return fig
+
+@lru_cache(maxsize=32)
+def _history_base_figure(warning_threshold, danger_threshold):
+    """
+    Builds the threshold lines, annotations and layout of the history chart.
+    
+    The threshold lines span the full plot width (paper coordinates), so the
+    template only depends on the thresholds and is cached per threshold pair.
+    Callers must copy the returned figure before adding traces to it.
+    
+    Args:
+        warning_threshold (float): Temperature threshold for warning alert
+        danger_threshold (float): Temperature threshold for danger alert
+        
+    Returns:
+        plotly.graph_objects.Figure: Figure without data traces
+    """
+    # Threshold lines and their labels, set in a single layout spec
+    layout = dict(
+        shapes=[
+            dict(
+                type="line",
+                xref="paper",
+                x0=0,
+                y0=warning_threshold,
+                x1=1,
+                y1=warning_threshold,
+                line=dict(color="orange", width=2, dash="dash"),
+            ),
+            dict(
+                type="line",
+                xref="paper",
+                x0=0,
+                y0=danger_threshold,
+                x1=1,
+                y1=danger_threshold,
+                line=dict(color="red", width=2, dash="dash"),
+            ),
+        ],
+        annotations=[
+            dict(
+                xref="paper",
+                x=1,
+                xanchor="right",
+                y=warning_threshold,
+                text="Warning Threshold",
+                showarrow=False,
+                yshift=10,
+                font=dict(color="orange")
+            ),
+            dict(
+                xref="paper",
+                x=1,
+                xanchor="right",
+                y=danger_threshold,
+                text="Danger Threshold",
+                showarrow=False,
+                yshift=10,
+                font=dict(color="red")
+            ),
+        ],
+        title="Temperature History (Last 24 hours)",
+        xaxis_title="Time",
+        yaxis_title="Temperature (°C)",
+        hovermode="x unified",
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+        # Keep the user's zoom/pan when the chart is redrawn on a rerun
+        uirevision="temperature-history",
+    )
+    
+    fig = go.Figure(dict(layout=layout))
+    
     return fig
 
 def plot_temperature_history(history_df, warning_threshold, danger_threshold):
@@ -103,70 +178,38 @@ def plot_temperature_history(history_df, warning_threshold, danger_threshold):
     Returns:
         plotly.graph_objects.Figure: Interactive time series plot
     """
-    # Create figure
-    fig = go.Figure()
+    # Downsample long histories so the browser payload stays bounded
+    if len(history_df) > MAX_HISTORY_POINTS:
+        keep = lttb_indices(
+            history_df['timestamp'].to_numpy().astype(np.int64),
+            history_df['temperature'].to_numpy(),
+            MAX_HISTORY_POINTS
+        )
+        history_df = history_df.iloc[keep]
     
-    # Add temperature line
-    fig.add_trace(go.Scatter(
-        x=history_df['timestamp'],
-        y=history_df['temperature'],
-        mode='lines+markers',
+    # Add temperature line (WebGL trace so long histories stay responsive); the
+    # columns are passed as ndarrays so Plotly doesn't copy them as Series
+    temperature_trace = dict(
+        type='scattergl',
+        x=history_df['timestamp'].to_numpy(),
+        y=history_df['temperature'].to_numpy(),
+        mode='lines+markers' if len(history_df) <= MAX_MARKER_POINTS else 'lines',
         name='Temperature (°C)',
         line=dict(color='#1f77b4', width=3),
         marker=dict(size=6)
-    ))
-    
-    # Add threshold lines
-    fig.add_shape(
-        type="line",
-        x0=history_df['timestamp'].min(),
-        y0=warning_threshold,
-        x1=history_df['timestamp'].max(),
-        y1=warning_threshold,
-        line=dict(color="orange", width=2, dash="dash"),
-    )
-    
-    fig.add_shape(
-        type="line",
-        x0=history_df['timestamp'].min(),
-        y0=danger_threshold,
-        x1=history_df['timestamp'].max(),
-        y1=danger_threshold,
-        line=dict(color="red", width=2, dash="dash"),
-    )
-    
-    # Add annotations
-    fig.add_annotation(
-        x=history_df['timestamp'].max(),
-        y=warning_threshold,
-        text="Warning Threshold",
-        showarrow=False,
-        yshift=10,
-        font=dict(color="orange")
-    )
-    
-    fig.add_annotation(
-        x=history_df['timestamp'].max(),
-        y=danger_threshold,
-        text="Danger Threshold",
-        showarrow=False,
-        yshift=10,
-        font=dict(color="red")
-    )
-    
-    # Set chart layout
-    fig.update_layout(
-        title="Temperature History (Last 24 hours)",
-        xaxis_title="Time",
-        yaxis_title="Temperature (°C)",
-        hovermode="x unified",
-        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
     )
     
     # Make sure y-axis covers appropriate temperature range with some padding
-    y_min = min(min(history_df['temperature']), warning_threshold) - 5
-    y_max = max(max(history_df['temperature']), danger_threshold) + 5
-    fig.update_yaxes(range=[y_min, y_max])
+    # (readings are reported to 0.1°C; rounding drops float32 representation noise)
+    temperatures = history_df['temperature'].to_numpy()
+    y_min = min(round(float(temperatures.min()), 1), warning_threshold) - 5
+    y_max = max(round(float(temperatures.max()), 1), danger_threshold) + 5
+    
+    # Copy the cached threshold template and add the data without running
+    # Plotly's property validators
+    fig = go.Figure(_history_base_figure(warning_threshold, danger_threshold), _validate=False)
+    fig.add_trace(temperature_trace)
+    fig.layout.yaxis.range = [y_min, y_max]
     
     return fig
 
@@ -185,72 +228,43 @@ def create_temperature_gauge(temperature, warning_threshold, danger_threshold):
     # Determine the maximum value for the gauge (at least 10 degrees above the current temperature)
     max_temp = max(50, temperature + 10, danger_threshold + 5)
     
-    # Create the gauge figure with animation
-    fig = go.Figure()
-    
-    # Add animated trace that goes from 0 to the actual temperature
-    for i in range(0, int(temperature) + 1, max(1, int(temperature // 10))):
-        fig.add_trace(
-            go.Indicator(
-                mode="gauge+number",
-                value=i,
-                domain={'x': [0, 1], 'y': [0, 1]},
-                title={'text': "Current Temperature (°C)"},
-                gauge={
-                    'axis': {'range': [0, max_temp]},
-                    'bar': {'color': "darkblue"},
-                    'steps': [
-                        {'range': [0, warning_threshold], 'color': "lightgreen"},
-                        {'range': [warning_threshold, danger_threshold], 'color': "orange"},
-                        {'range': [danger_threshold, max_temp], 'color': "red"}
-                    ],
-                    'threshold': {
-                        'line': {'color': "red", 'width': 4},
-                        'thickness': 0.75,
-                        'value': i
-                    }
-                },
-                visible=False
-            )
-        )
-    
-    # Add the final gauge with the actual temperature
-    fig.add_trace(
-        go.Indicator(
-            mode="gauge+number",
-            value=temperature,
-            domain={'x': [0, 1], 'y': [0, 1]},
-            title={'text': "Current Temperature (°C)"},
-            gauge={
-                'axis': {'range': [0, max_temp]},
-                'bar': {'color': "darkblue"},
-                'steps': [
-                    {'range': [0, warning_threshold], 'color': "lightgreen"},
-                    {'range': [warning_threshold, danger_threshold], 'color': "orange"},
-                    {'range': [danger_threshold, max_temp], 'color': "red"}
-                ],
-                'threshold': {
-                    'line': {'color': "red", 'width': 4},
-                    'thickness': 0.75,
-                    'value': temperature
-                }
+    # Single Indicator trace showing the actual temperature
+    indicator = dict(
+        type='indicator',
+        mode="gauge+number",
+        value=temperature,
+        domain={'x': [0, 1], 'y': [0, 1]},
+        title={'text': "Current Temperature (°C)"},
+        gauge={
+            'axis': {'range': [0, max_temp]},
+            'bar': {'color': "darkblue"},
+            'steps': [
+                {'range': [0, warning_threshold], 'color': "lightgreen"},
+                {'range': [warning_threshold, danger_threshold], 'color': "orange"},
+                {'range': [danger_threshold, max_temp], 'color': "red"}
+            ],
+            'threshold': {
+                'line': {'color': "red", 'width': 4},
+                'thickness': 0.75,
+                'value': temperature
             }
-        )
+        }
     )
     
-    # Create frames for animation
-    frames = []
-    for i in range(len(fig.data)):
-        frame_data = []
-        for j in range(len(fig.data)):
-            visible = True if j == i else False
-            frame_data.append(go.Indicator(visible=visible))
-        frames.append(go.Frame(data=frame_data, name=str(i)))
-    
-    fig.frames = frames
+    # Create frames for animation: each frame only updates the value of the
+    # single gauge trace, stepping from 0 up to the actual temperature
+    steps = list(range(0, int(temperature) + 1, max(1, int(temperature // 10))))
+    steps.append(temperature)
+    frames = [
+        dict(
+            data=[dict(type='indicator', value=value, gauge={'threshold': {'value': value}})],
+            name=str(i)
+        )
+        for i, value in enumerate(steps)
+    ]
     
     # Add animation buttons
-    fig.update_layout(
+    layout = dict(
         updatemenus=[{
             'type': 'buttons',
             'showactive': False,
@@ -266,8 +280,79 @@ def create_temperature_gauge(temperature, warning_threshold, danger_threshold):
         margin=dict(l=10, r=10, t=50, b=50),
     )
     
+    # Build the figure from one spec without running Plotly's property validators
+    fig = go.Figure(dict(data=[indicator], layout=layout, frames=frames), _validate=False)
+    
     return fig
 
+# HTML with embedded CSS animation for each icon band. Only the animation
+# duration varies between calls, so it is the single %s placeholder and the
+# keyframe percentages are escaped as %%.
+_ICON_TEMPLATES = {
+    'fire': """
+    <style>
+        
+        @keyframes pulse-fire {
+            0%% { transform: scale(1); opacity: 0.8; }
+            50%% { transform: scale(1.2); opacity: 1; }
+            100%% { transform: scale(1); opacity: 0.8; }
+        }
+        
+        .animated-icon-fire {
+            display: inline-block;
+            animation: pulse-fire %ss infinite;
+            color: red;
+            font-size: 3rem;
+        }
+    </style>
+    <div class="animated-icon-fire">
+        <i class="fas fa-fire"></i>
+    </div>
+    """,
+    'thermometer-three-quarters': """
+    <style>
+        
+        @keyframes shake-thermometer-three-quarters {
+            0%% { transform: rotate(0deg); }
+            25%% { transform: rotate(5deg); }
+            50%% { transform: rotate(0deg); }
+            75%% { transform: rotate(-5deg); }
+            100%% { transform: rotate(0deg); }
+        }
+        
+        .animated-icon-thermometer-three-quarters {
+            display: inline-block;
+            animation: shake-thermometer-three-quarters %ss infinite;
+            color: orange;
+            font-size: 3rem;
+        }
+    </style>
+    <div class="animated-icon-thermometer-three-quarters">
+        <i class="fas fa-thermometer-three-quarters"></i>
+    </div>
+    """,
+    'thermometer-quarter': """
+    <style>
+        
+        @keyframes fade-thermometer-quarter {
+            0%% { opacity: 0.7; }
+            50%% { opacity: 1; }
+            100%% { opacity: 0.7; }
+        }
+        
+        .animated-icon-thermometer-quarter {
+            display: inline-block;
+            animation: fade-thermometer-quarter %ss infinite;
+            color: green;
+            font-size: 3rem;
+        }
+    </style>
+    <div class="animated-icon-thermometer-quarter">
+        <i class="fas fa-thermometer-quarter"></i>
+    </div>
+    """
+}
+
 def add_animated_icon(temperature):
     """
     Creates an animated icon based on the temperature level.
@@ -283,57 +368,8 @@ def add_animated_icon(temperature):
     animation_speed = max(1, min(5, temperature / 10))  # Scale between 1-5 seconds
     
     if temperature >= 35:  # High temperature - fire icon
-        icon_color = "red"
-        icon_name = "fire"
-        animation = f"""
-        @keyframes pulse-{icon_name} {{
-            0% {{ transform: scale(1); opacity: 0.8; }}
-            50% {{ transform: scale(1.2); opacity: 1; }}
-            100% {{ transform: scale(1); opacity: 0.8; }}
-        }}
-        """
-        animation_style = f"animation: pulse-{icon_name} {animation_speed}s infinite;"
-    
+        return _ICON_TEMPLATES['fire'] % animation_speed
     elif temperature >= 25:  # Medium temperature - thermometer icon
-        icon_color = "orange"
-        icon_name = "thermometer-three-quarters"
-        animation = f"""
-        @keyframes shake-{icon_name} {{
-            0% {{ transform: rotate(0deg); }}
-            25% {{ transform: rotate(5deg); }}
-            50% {{ transform: rotate(0deg); }}
-            75% {{ transform: rotate(-5deg); }}
-            100% {{ transform: rotate(0deg); }}
-        }}
-        """
-        animation_style = f"animation: shake-{icon_name} {animation_speed}s infinite;"
-    
+        return _ICON_TEMPLATES['thermometer-three-quarters'] % animation_speed
     else:  # Low temperature - normal thermometer
-        icon_color = "green"
-        icon_name = "thermometer-quarter"
-        animation = f"""
-        @keyframes fade-{icon_name} {{
-            0% {{ opacity: 0.7; }}
-            50% {{ opacity: 1; }}
-            100% {{ opacity: 0.7; }}
-        }}
-        """
-        animation_style = f"animation: fade-{icon_name} {animation_speed*2}s infinite;"
-    
-    # Generate the HTML with embedded CSS animation
-    html = f"""
-    <style>
-        {animation}
-        .animated-icon-{icon_name} {{
-            display: inline-block;
-            {animation_style}
-            color: {icon_color};
-            font-size: 3rem;
-        }}
-    </style>
-    <div class="animated-icon-{icon_name}">
-        <i class="fas fa-{icon_name}"></i>
-    </div>
-    """
-    
-    return html
\ No newline at end of file
+        return _ICON_TEMPLATES['thermometer-quarter'] % (animation_speed * 2)